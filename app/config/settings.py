@@ -1,37 +1,71 @@
-import os
-from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
+from functools import lru_cache
+from typing import Annotated, Any
 
-load_dotenv()
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
+from dotenv import load_dotenv
 
 
 class Settings(BaseSettings):
     """Application settings and configuration."""
-    
+
     # Application Settings
-    STAGE: str = os.getenv("STAGE", "local")
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
-    MAX_ITERATIONS: int = int(os.getenv("MAX_ITERATIONS", "10"))
-    
+    STAGE: str = "local"
+    LOG_LEVEL: str = "INFO"
+    MAX_ITERATIONS: int = 10
+
     # LLM Configuration
-    MODEL_NAME: str = os.getenv("MODEL_NAME", "gpt-4o-mini")
-    LLM_API_KEY: str = os.getenv("LLM_API_KEY", "")
-    
+    MODEL_NAME: str = "gpt-4o-mini"
+    LLM_API_KEY: str = ""
+
     # API Configuration
-    API_PORT: int = int(os.getenv("API_PORT", "8000"))
-    DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
-    
+    API_PORT: int = 8000
+    DEBUG: bool = False
+
     # CORS Configuration
-    CORS_ORIGINS: list[str] = os.getenv(
-        "CORS_ORIGINS",
-        "http://localhost,http://localhost:3000"
-    ).split(",")
-    
-    class Config:
-        case_sensitive = True
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-
-
-# Create settings instance
-settings = Settings()
+    # A frozenset so per-request origin checks are O(1) membership tests.
+    CORS_ORIGINS: Annotated[frozenset[str], NoDecode] = Field(
+        default_factory=lambda: frozenset({"http://localhost", "http://localhost:3000"})
+    )
+
+    model_config = SettingsConfigDict(
+        case_sensitive=True,
+        env_file=".env",
+        env_file_encoding="utf-8",
+        defer_build=True,
+    )
+
+    @field_validator("LOG_LEVEL", mode="before")
+    @classmethod
+    def upper_case_log_level(cls, value: Any) -> Any:
+        """Accepts any case, e.g. `LOG_LEVEL=debug`."""
+        if isinstance(value, str):
+            return value.upper()
+        return value
+
+    @field_validator("CORS_ORIGINS", mode="before")
+    @classmethod
+    def split_cors_origins(cls, value: Any) -> Any:
+        """Accepts a comma-separated string, e.g. `CORS_ORIGINS=http://a,http://b`."""
+        if isinstance(value, str):
+            return frozenset(origin.strip() for origin in value.split(",") if origin.strip())
+        return frozenset(value)
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Returns the process-wide settings instance.
+
+    The `.env` file is loaded and the settings are built only once, on first use.
+    """
+    load_dotenv(override=False)
+    return Settings()
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from app.config.settings import settings` working without
+    # building the settings at import time.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
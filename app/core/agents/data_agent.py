@@ -1,26 +1,146 @@
+import os
+import threading
 import pandas as pd
-from enum import Enum
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-from langchain.tools import tool, BaseTool
+from collections import OrderedDict, deque
+from pydantic import BaseModel, ConfigDict
+from types import MappingProxyType
+from typing import List, Deque, Dict, Any, Callable, Literal, Mapping, Optional, Tuple, Type, get_args
+from langchain.tools import BaseTool, StructuredTool
 from langchain_litellm.chat_models import ChatLiteLLM
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import Runnable
+from app.config.settings import get_settings
+from app.core.agents.parallel_executor import ParallelToolAgentExecutor
 from app.core.agents.tools import inspection_tools, transformation_tools
+from app.core.agents.tools.exceptions import EmptyDataFrameError
+from app.core.agents.tools.types import DataFrameColumnDetailedInformation, DataFrameColumnNames
 from app.core.agents.prompts.data_agent_prompt import DATA_AGENT_PROMPT
 
 
-class DataFrameType(Enum):
-    PRIMARY = 'primary'
-    MAPPING = 'mapping'
+# A Literal rather than an Enum: tool arguments arrive as plain strings that are used
+# directly as dict keys and in comparisons, with no Enum lookup or `.value` access.
+DataFrameType = Literal["primary", "mapping"]
+DATAFRAME_TYPES: Tuple[DataFrameType, ...] = get_args(DataFrameType)
+
+
+# Tools that never modify a DataFrame and may therefore run concurrently.
+READ_ONLY_TOOLS = frozenset({
+    "get_column_names",
+    "get_column_detailed_information",
+    "get_categorical_and_continuous_info",
+    "get_column_sample_values",
+})
 
 
 class ToolResponse(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True, validate_assignment=False, defer_build=True)
+
     execution_success: bool
     error_message: Optional[str] = None
     success_message: Optional[str] = None
-    other_info: Optional[Any] = None
+    # Large payloads are attached via `model_construct`, which skips validation.
+    other_info: Any = None
+
+
+# The prompt is identical for every agent, so it is compiled once and shared.
+_DATA_AGENT_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", DATA_AGENT_PROMPT),
+    MessagesPlaceholder(variable_name="chat_history"),
+    ("human", "{input}"),
+    MessagesPlaceholder(variable_name="agent_scratchpad"),
+])
+
+
+class GetColumnNamesInput(BaseModel):
+    df_type: DataFrameType = "primary"
+
+
+class GetColumnDetailedInformationInput(BaseModel):
+    column_name: str
+    df_type: DataFrameType = "primary"
+
+
+class GetCategoricalAndContinuousInfoInput(BaseModel):
+    df_type: DataFrameType = "primary"
+
+
+class GetColumnSampleValuesInput(BaseModel):
+    num_samples: int = 5
+    df_type: DataFrameType = "primary"
+
+
+class RenameColumnInput(BaseModel):
+    old_column_name: str
+    new_column_name: str
+    df_type: DataFrameType = "primary"
+
+
+class ReplaceValueInput(BaseModel):
+    column_name: str
+    old_value: str
+    new_value: str
+    df_type: DataFrameType = "primary"
+
+
+class AddNewColumnFromMathOperationInput(BaseModel):
+    column_name: str
+    operation_type: str
+    source_columns: List[str]
+    df_type: DataFrameType = "primary"
+
+
+class MergeDataFramesInput(BaseModel):
+    primary_df_col: str
+    mapping_df_col: str
+    new_column_name: str
+
+
+# Tool-calling agent runnables shared between DataAgent instances. A runnable only holds the
+# tools' schemas, not the bound tool functions, so agents with the same LLM, prompt and tool
+# schemas can reuse it. Entries keep the LLM and prompt alive, so their ids stay unique.
+_AGENT_RUNNABLE_CACHE: "OrderedDict[Tuple[Any, ...], Tuple[ChatLiteLLM, ChatPromptTemplate, Runnable]]" = OrderedDict()
+_AGENT_RUNNABLE_CACHE_SIZE = 32
+_agent_runnable_cache_lock = threading.Lock()
+
+
+def _get_agent_runnable(llm: ChatLiteLLM, tools: List[BaseTool], prompt: ChatPromptTemplate) -> Runnable:
+    tool_key = tuple((tool.name, tool.description, tool.args_schema) for tool in tools)
+    cache_key = (id(llm), tool_key, id(prompt))
+    with _agent_runnable_cache_lock:
+        cached = _AGENT_RUNNABLE_CACHE.get(cache_key)
+        if cached is not None:
+            _AGENT_RUNNABLE_CACHE.move_to_end(cache_key)
+            return cached[2]
+
+    agent = create_tool_calling_agent(llm, tools, prompt)
+    with _agent_runnable_cache_lock:
+        _AGENT_RUNNABLE_CACHE[cache_key] = (llm, prompt, agent)
+        if len(_AGENT_RUNNABLE_CACHE) > _AGENT_RUNNABLE_CACHE_SIZE:
+            _AGENT_RUNNABLE_CACHE.popitem(last=False)
+    return agent
+
+
+# Metadata cached per column: "details" (detailed column information), "merge_keys"
+# (lookup indexes over merge key columns) and "unique_values" (the set of values of
+# string columns).
+# Changing one column leaves the entries of the others valid.
+_PER_COLUMN_META = ("details", "merge_keys", "unique_values")
+
+
+def _compose_mapping(mapping: Dict[str, str], old: str, new: str) -> None:
+    """
+    Folds a further `old -> new` step into a mapping that is applied simultaneously,
+    so that applying the mapping once gives the same result as applying each step in turn.
+    """
+    for key, value in mapping.items():
+        if value == old:
+            mapping[key] = new
+    if old not in mapping:
+        mapping[old] = new
+    for key in [key for key, value in mapping.items() if key == value]:
+        del mapping[key]
 
 
 class DataAgent:
@@ -38,21 +158,176 @@ class DataAgent:
             df (pd.DataFrame): The pandas DataFrame the agent will work with.
             llm (ChatLiteLLM): The language model to power the agent.
         """
-        self.dfs = {
-            DataFrameType.PRIMARY: df,
-            DataFrameType.MAPPING: mapping_df,
-        }
+        self._primary_df = df
+        self._mapping_df = mapping_df
         self.llm = llm
         self.tools = self.get_tools()
         self.prompt = self.get_prompt()
         self.agent_executor = self.create_executor()
-        self.chat_history = []
+        # Sliding window over the conversation: only the most recent exchanges are
+        # resent to the LLM, so prompt size stays bounded in long sessions.
+        self.chat_history: Deque[BaseMessage] = deque(maxlen=2 * get_settings().MAX_ITERATIONS)
+        # Renames and value replacements are validated eagerly but applied lazily.
+        # Consecutive operations of the same kind are fused into a single mapping, so
+        # a run of N edits rewrites the DataFrame once, when its data is next needed.
+        self._pending_ops: Dict[DataFrameType, List[Tuple[Any, ...]]] = {df_type: [] for df_type in DATAFRAME_TYPES}
+        # Metadata answered without scanning the data: "columns" (with pending renames
+        # applied), "samples" (sample values by number of samples), "classification" (the
+        # categorical/continuous split) and, by column name, the entries listed in
+        # _PER_COLUMN_META. Filled on demand.
+        self._meta_cache: Dict[DataFrameType, Dict[str, Any]] = {df_type: {} for df_type in DATAFRAME_TYPES}
+        # Read-only tools may run in parallel threads. Pending operations are applied, and
+        # the metadata cache read and written, only while holding this lock.
+        self._state_lock = threading.RLock()
+
+    @property
+    def dfs(self) -> Mapping[DataFrameType, Optional[pd.DataFrame]]:
+        """
+        The primary and mapping DataFrames by type, with pending operations applied.
+
+        Read-only: replace a DataFrame through `_set_df` so cached metadata stays valid.
+        """
+        return MappingProxyType({df_type: self._get_df(df_type) for df_type in DATAFRAME_TYPES})
 
     def _get_df(self, df_type: DataFrameType) -> Optional[pd.DataFrame]:
-        return self.dfs[df_type]
+        with self._state_lock:
+            self._apply_pending_ops(df_type)
+            return self._get_base_df(df_type)
+
+    def _get_base_df(self, df_type: DataFrameType) -> Optional[pd.DataFrame]:
+        """
+        Returns the stored DataFrame without applying pending operations.
+        """
+        return self._primary_df if df_type == "primary" else self._mapping_df
+
+    def _store_df(self, df: pd.DataFrame, df_type: DataFrameType) -> None:
+        if df_type == "primary":
+            self._primary_df = df
+        else:
+            self._mapping_df = df
+
+    def _set_df(self, df: pd.DataFrame, df_type: DataFrameType = "primary") -> None:
+        with self._state_lock:
+            self._store_df(df, df_type)
+            self._pending_ops[df_type] = []
+            self._meta_cache[df_type] = {}
+
+    def _get_columns(self, df_type: DataFrameType) -> List[str]:
+        """
+        Returns the current column names without applying pending operations.
+        """
+        with self._state_lock:
+            meta = self._meta_cache[df_type]
+            if "columns" not in meta:
+                meta["columns"] = list(self._get_base_df(df_type).columns)
+            return meta["columns"]
+
+    def _get_meta(self, df_type: DataFrameType, key: str, build: Callable[[], Any]) -> Any:
+        """
+        Returns the cached metadata entry `key`, building it with `build` on a miss.
+        """
+        with self._state_lock:
+            meta = self._meta_cache[df_type]
+            if key in meta:
+                return meta[key]
+        # Built outside the lock so read-only tools running in parallel still compute
+        # concurrently; `build` gets the data through `_get_df`, which takes the lock.
+        value = build()
+        with self._state_lock:
+            # Not cached if the data changed meanwhile and the metadata was replaced.
+            if self._meta_cache[df_type] is meta:
+                value = meta.setdefault(key, value)
+        return value
+
+    def _get_keyed_meta(self, df_type: DataFrameType, key: str, item: Any, build: Callable[[], Any]) -> Any:
+        """
+        Like `_get_meta`, for metadata cached by column name (or another item) under `key`.
+        """
+        with self._state_lock:
+            meta = self._meta_cache[df_type]
+            if item in meta.get(key, {}):
+                return meta[key][item]
+        value = build()
+        with self._state_lock:
+            if self._meta_cache[df_type] is meta:
+                value = meta.setdefault(key, {}).setdefault(item, value)
+        return value
+
+    def _drop_data_meta(self, df_type: DataFrameType, column_name: str, new_column_name: Optional[str] = None) -> None:
+        """
+        Drops cached metadata invalidated by a change to `column_name`. Frame-wide entries are
+        dropped; per-column entries of other columns are kept, and those of a renamed column
+        move to `new_column_name`. Unique values of a column with replaced values are kept,
+        as `_defer_replace` updates them itself.
+        """
+        meta = self._meta_cache[df_type]
+        kept = {key: meta[key] for key in ("columns", *_PER_COLUMN_META) if key in meta}
+        for key in _PER_COLUMN_META:
+            per_column = kept.get(key)
+            if per_column is None or column_name not in per_column:
+                continue
+            if new_column_name is not None and key != "details":
+                per_column[new_column_name] = per_column.pop(column_name)
+            elif new_column_name is not None or key != "unique_values":
+                # Detailed information embeds the column name, so it is rebuilt after a rename.
+                del per_column[column_name]
+        self._meta_cache[df_type] = kept
+
+    def _get_merge_key_index(self, mapping_df: pd.DataFrame, mapping_df_col: str) -> Optional[pd.Index]:
+        if mapping_df_col not in mapping_df.columns:
+            return None
+        return self._get_keyed_meta(
+            "mapping", "merge_keys", mapping_df_col,
+            lambda: transformation_tools.build_merge_key_index(mapping_df, mapping_df_col)
+        )
+
+    def _apply_pending_ops(self, df_type: DataFrameType) -> None:
+        with self._state_lock:
+            pending_ops = self._pending_ops[df_type]
+            if not pending_ops:
+                return
+            df = self._get_base_df(df_type)
+            try:
+                while pending_ops:
+                    # Dequeued before it runs, so an operation that already changed the
+                    # frame is never applied a second time, even if a later one fails.
+                    op = pending_ops.pop(0)
+                    if op[0] == "rename":
+                        df = transformation_tools.rename_columns(df, op[1])
+                    else:
+                        df = transformation_tools.replace_values(df, op[1], op[2])
+            except Exception:
+                # The remaining operations, and the cached metadata, describe the state the
+                # failed operation would have produced; both are dropped.
+                pending_ops.clear()
+                self._meta_cache[df_type] = {}
+                raise
+            finally:
+                # Other threads wait on the lock until the frame is stored, so they never
+                # read a half-applied one.
+                self._store_df(df, df_type)
+
+    def _defer_rename(self, df_type: DataFrameType, old_column_name: str, new_column_name: str) -> None:
+        with self._state_lock:
+            pending_ops = self._pending_ops[df_type]
+            if not pending_ops or pending_ops[-1][0] != "rename":
+                pending_ops.append(("rename", {}))
+            _compose_mapping(pending_ops[-1][1], old_column_name, new_column_name)
+            columns = self._get_columns(df_type)
+            columns[columns.index(old_column_name)] = new_column_name
+            self._drop_data_meta(df_type, old_column_name, new_column_name)
 
-    def _set_df(self, df: pd.DataFrame, df_type: DataFrameType = DataFrameType.PRIMARY) -> None:
-        self.dfs[df_type] = df
+    def _defer_replace(self, df_type: DataFrameType, column_name: str, old_value: str, new_value: str) -> None:
+        with self._state_lock:
+            pending_ops = self._pending_ops[df_type]
+            if not pending_ops or pending_ops[-1][:2] != ("replace", column_name):
+                pending_ops.append(("replace", column_name, {}))
+            _compose_mapping(pending_ops[-1][2], old_value, new_value)
+            column_values = self._meta_cache[df_type].get("unique_values", {}).get(column_name)
+            if column_values is not None and old_value in column_values:
+                column_values.discard(old_value)
+                column_values.add(new_value)
+            self._drop_data_meta(df_type, column_name)
 
     def get_tools(self) -> List[BaseTool]:
         """
@@ -60,215 +335,256 @@ class DataAgent:
 
         This method should be overridden in subclasses to add more specific tools.
         """
+        return [
+            self._build_tool("get_column_names", self._get_column_names, GetColumnNamesInput),
+            self._build_tool("get_column_detailed_information", self._get_column_detailed_information, GetColumnDetailedInformationInput),
+            self._build_tool("get_categorical_and_continuous_info", self._get_categorical_and_continuous_info, GetCategoricalAndContinuousInfoInput),
+            self._build_tool("get_column_sample_values", self._get_column_sample_values, GetColumnSampleValuesInput),
+            self._build_tool("rename_column", self._rename_column, RenameColumnInput),
+            self._build_tool("replace_value", self._replace_value, ReplaceValueInput),
+            self._build_tool("add_new_column_from_math_operation", self._add_new_column_from_math_operation, AddNewColumnFromMathOperationInput),
+            self._build_tool("merge_dataframes", self._merge_dataframes, MergeDataFramesInput),
+        ]
 
-        @tool
-        def get_column_names(df_type: DataFrameType = DataFrameType.PRIMARY) -> ToolResponse:
-            """
-            Retrieves the names of all columns in the DataFrame.
-            The response includes a list of column names.
-            This is useful for understanding the DataFrame's structure.
-            """
-            try:
-                column_names = inspection_tools.get_column_names(self._get_df(df_type))
-                return ToolResponse(
-                    execution_success=True,
-                    success_message="Column names retrieved successfully",
-                    other_info=column_names
-                )
-            except Exception as e:
-                return ToolResponse(
-                    execution_success=False,
-                    error_message=str(e)
-                )
+    @staticmethod
+    def _build_tool(name: str, func: Callable[..., ToolResponse], args_schema: Type[BaseModel]) -> BaseTool:
+        """
+        Wraps a bound tool method as a LangChain tool.
 
-        @tool
-        def get_column_detailed_information(column_name: str, df_type: DataFrameType = DataFrameType.PRIMARY) -> ToolResponse:
-            """
-            Provides detailed information about a specific column.
-            This includes unique values, their counts, and percentages.
-            The response contains a detailed summary of the column's data.
-            Args:
-                column_name: The exact name of the column to analyze.
-            """
-            try:
-                column_detailed_info = inspection_tools.get_column_detailed_information(self._get_df(df_type), column_name)
-                return ToolResponse(
-                    execution_success=True,
-                    success_message="Unique values retrieved successfully",
-                    other_info=column_detailed_info
-                )
-            except Exception as e:
-                return ToolResponse(
-                    execution_success=False,
-                    error_message=str(e)
-                )
+        The args schema is declared once at module level, so building the tools for a
+        new agent does not re-infer a pydantic model from every method signature.
+        The method's docstring is used as the tool description.
+        """
+        return StructuredTool.from_function(func=func, name=name, args_schema=args_schema)
 
-        @tool
-        def get_categorical_and_continuous_info(df_type: DataFrameType = DataFrameType.PRIMARY) -> ToolResponse:
-            """
-            Classifies all columns in the DataFrame as either categorical or continuous.
-            For categorical columns, it returns a list of their unique values.
-            This tool is helpful for an initial assessment of the DataFrame's data types.
-            """
-            try:
-                columns_info = inspection_tools.get_categorical_and_continuous_information(self._get_df(df_type))
-                return ToolResponse(
-                    execution_success=True,
-                    success_message="Categorical and continuous info retrieved successfully",
-                    other_info=columns_info
-                )
-            except Exception as e:
-                return ToolResponse(
-                    execution_success=False,
-                    error_message=str(e)
-                )
+    def _get_column_names(self, df_type: DataFrameType = "primary") -> ToolResponse:
+        """
+        Retrieves the names of all columns in the DataFrame.
+        The response includes a list of column names.
+        This is useful for understanding the DataFrame's structure.
+        """
+        try:
+            # Answered from the tracked column names, so pending edits are not applied.
+            with self._state_lock:
+                if self._get_base_df(df_type).empty:
+                    raise EmptyDataFrameError(operation="get column names")
+                column_names = DataFrameColumnNames(column_names=list(self._get_columns(df_type)))
+            return ToolResponse.model_construct(
+                execution_success=True,
+                success_message="Column names retrieved successfully",
+                other_info=column_names
+            )
+        except Exception as e:
+            return ToolResponse(
+                execution_success=False,
+                error_message=str(e)
+            )
 
-        @tool
-        def get_column_sample_values(num_samples: int = 5, df_type: DataFrameType = DataFrameType.PRIMARY) -> ToolResponse:
-            """
-            Retrieves sample of values from all columns.
-            This tool is useful for quickly checking the pattern of values in all columns.
-            Args:
-                    num_samples: The number of samples to retrieve.
-                """
-            try:
-                sample_values = inspection_tools.get_column_sample_values(self._get_df(df_type), num_samples)
-                return ToolResponse(
-                    execution_success=True,
-                    success_message="Sample values retrieved successfully",
-                    other_info=sample_values
-                )
-            except Exception as e:
-                return ToolResponse(
-                    execution_success=False,
-                    error_message=str(e)
-                )
-            
-        @tool
-        def rename_column(old_column_name: str, new_column_name: str, df_type: DataFrameType = DataFrameType.PRIMARY) -> ToolResponse:
-            """
-            Renames a column in the DataFrame.
-            
-            Args:
-                old_column_name: The current name of the column to be renamed.
-                new_column_name: The new name for the column.
-            """
-            try:
-                updated_df = transformation_tools.rename_column(self._get_df(df_type), old_column_name, new_column_name)
-                self._set_df(updated_df, df_type)
-                return ToolResponse(
-                    execution_success=True,
-                    success_message=f"Successfully renamed column '{old_column_name}' to '{new_column_name}'."
-                )
-            except Exception as e:
-                return ToolResponse(
-                    execution_success=False,
-                    error_message=str(e)
-                )
+    def _get_column_detailed_information(self, column_name: str, df_type: DataFrameType = "primary") -> ToolResponse:
+        """
+        Provides detailed information about a specific column.
+        This includes unique values, their counts, and percentages.
+        The response contains a detailed summary of the column's data.
+        Args:
+            column_name: The exact name of the column to analyze.
+        """
+        try:
+            column_detailed_info = self._get_keyed_meta(
+                df_type, "details", column_name,
+                lambda: self._build_column_details(df_type, column_name)
+            )
+            return ToolResponse.model_construct(
+                execution_success=True,
+                success_message="Unique values retrieved successfully",
+                other_info=column_detailed_info
+            )
+        except Exception as e:
+            return ToolResponse(
+                execution_success=False,
+                error_message=str(e)
+            )
 
-        @tool
-        def replace_value(column_name: str, old_value: str, new_value: str, df_type: DataFrameType = DataFrameType.PRIMARY) -> ToolResponse:
-            """
-            Replaces a specific value in a column with a new value.
-            
-            Args:
-                column_name: The name of the column where the replacement should occur.
-                old_value: The value to be replaced.
-                new_value: The new value to replace the old value.
+    def _build_column_details(self, df_type: DataFrameType, column_name: str) -> DataFrameColumnDetailedInformation:
+        df = self._get_df(df_type)
+        column_detailed_info = inspection_tools.get_column_detailed_information(df, column_name)
+        # For string columns, set membership gives the same answer as the element-wise
+        # comparison replace_value would run, so it can rule out no-op replacements.
+        if df[column_name].dtype == object:
+            self._get_keyed_meta(df_type, "unique_values", column_name, lambda: set(column_detailed_info.unique_values))
+        return column_detailed_info
+
+    def _get_categorical_and_continuous_info(self, df_type: DataFrameType = "primary") -> ToolResponse:
+        """
+        Classifies all columns in the DataFrame as either categorical or continuous.
+        For categorical columns, it returns a list of their unique values.
+        This tool is helpful for an initial assessment of the DataFrame's data types.
+        """
+        try:
+            columns_info = self._get_meta(
+                df_type, "classification",
+                lambda: inspection_tools.get_categorical_and_continuous_information(self._get_df(df_type))
+            )
+            return ToolResponse.model_construct(
+                execution_success=True,
+                success_message="Categorical and continuous info retrieved successfully",
+                other_info=columns_info
+            )
+        except Exception as e:
+            return ToolResponse(
+                execution_success=False,
+                error_message=str(e)
+            )
+
+    def _get_column_sample_values(self, num_samples: int = 5, df_type: DataFrameType = "primary") -> ToolResponse:
+        """
+        Retrieves sample of values from all columns.
+        This tool is useful for quickly checking the pattern of values in all columns.
+        Args:
+                num_samples: The number of samples to retrieve.
             """
-            try:
+        try:
+            # Sampling is seeded, so the result only changes when the data does.
+            sample_values = self._get_keyed_meta(
+                df_type, "samples", num_samples,
+                lambda: inspection_tools.get_column_sample_values(self._get_df(df_type), num_samples)
+            )
+            return ToolResponse.model_construct(
+                execution_success=True,
+                success_message="Sample values retrieved successfully",
+                other_info=sample_values
+            )
+        except Exception as e:
+            return ToolResponse(
+                execution_success=False,
+                error_message=str(e)
+            )
+        
+    def _rename_column(self, old_column_name: str, new_column_name: str, df_type: DataFrameType = "primary") -> ToolResponse:
+        """
+        Renames a column in the DataFrame.
+        
+        Args:
+            old_column_name: The current name of the column to be renamed.
+            new_column_name: The new name for the column.
+        """
+        try:
+            if self._get_base_df(df_type).empty:
+                raise EmptyDataFrameError(operation="column rename")
+            transformation_tools.validate_rename_column(self._get_columns(df_type), old_column_name, new_column_name)
+            if old_column_name != new_column_name:
+                self._defer_rename(df_type, old_column_name, new_column_name)
+            return ToolResponse(
+                execution_success=True,
+                success_message=f"Successfully renamed column '{old_column_name}' to '{new_column_name}'."
+            )
+        except Exception as e:
+            return ToolResponse(
+                execution_success=False,
+                error_message=str(e)
+            )
+
+    def _replace_value(self, column_name: str, old_value: str, new_value: str, df_type: DataFrameType = "primary") -> ToolResponse:
+        """
+        Replaces a specific value in a column with a new value.
+        
+        Args:
+            column_name: The name of the column where the replacement should occur.
+            old_value: The value to be replaced.
+            new_value: The new value to replace the old value.
+        """
+        try:
+            if transformation_tools.is_missing_value_marker(old_value):
                 updated_df = transformation_tools.replace_value(self._get_df(df_type), column_name, old_value, new_value)
                 self._set_df(updated_df, df_type)
-                return ToolResponse(
-                    execution_success=True,
-                    success_message=f"Successfully replaced '{old_value}' with '{new_value}' in column '{column_name}'."
-                )
-            except Exception as e:
-                return ToolResponse(
-                    execution_success=False,
-                    error_message=str(e)
-                )
+            else:
+                transformation_tools.validate_replace_value(self._get_columns(df_type), column_name, old_value, new_value)
+                with self._state_lock:
+                    column_values = self._meta_cache[df_type].get("unique_values", {}).get(column_name)
+                if column_values is not None and old_value not in column_values:
+                    return ToolResponse.model_construct(
+                        execution_success=True,
+                        success_message=f"No change: '{old_value}' does not occur in column '{column_name}'."
+                    )
+                if old_value != new_value:
+                    self._defer_replace(df_type, column_name, old_value, new_value)
+            return ToolResponse(
+                execution_success=True,
+                success_message=f"Successfully replaced '{old_value}' with '{new_value}' in column '{column_name}'."
+            )
+        except Exception as e:
+            return ToolResponse(
+                execution_success=False,
+                error_message=str(e)
+            )
 
-        @tool
-        def add_new_column_from_math_operation(column_name: str, operation_type: str, source_columns: List[str], df_type: DataFrameType = DataFrameType.PRIMARY) -> ToolResponse:
-            """
-            Adds a new column to the DataFrame by performing a safe, pre-defined operation on existing columns.
-            
-            This tool is designed to prevent unsafe code execution. It uses a controlled set of operations.
-
-            Args:
-                column_name (str): The name for the new column.
-                operation_type (str): The type of operation to perform.
-                    - "sum": Adds the values of the source_columns.
-                    - "difference": Subtracts the second source_column from the first.
-                    - "product": Multiplies the values of the source_columns.
-                    - "quotient": Divides the first source_column by the second.
-                    - "mean": Calculates the average of the source_columns.
-                source_columns (List[str]): A list of column names to use in the operation.
-                    - For "difference" and "quotient", the list must contain exactly two columns.
-                    - For other operations, the list can contain two or more columns.
-            """
-            try:
-                updated_df = transformation_tools.add_new_column_from_math_operation(self._get_df(df_type), column_name, operation_type, source_columns)
-                self._set_df(updated_df, df_type)
-                return ToolResponse(
-                    execution_success=True,
-                    success_message=f"Successfully added new column '{column_name}' with a '{operation_type}' operation."
-                )
-            except Exception as e:
-                return ToolResponse(
-                    execution_success=False,
-                    error_message=str(e)
-                )
+    def _add_new_column_from_math_operation(self, column_name: str, operation_type: str, source_columns: List[str], df_type: DataFrameType = "primary") -> ToolResponse:
+        """
+        Adds a new column to the DataFrame by performing a safe, pre-defined operation on existing columns.
+        
+        This tool is designed to prevent unsafe code execution. It uses a controlled set of operations.
 
-        @tool
-        def merge_dataframes(primary_df_col: str, mapping_df_col: str, new_column_name: str) -> ToolResponse:
-            """
-            Merges the mapping DataFrame into the primary DataFrame based on a common key.
+        Args:
+            column_name (str): The name for the new column.
+            operation_type (str): The type of operation to perform.
+                - "sum": Adds the values of the source_columns.
+                - "difference": Subtracts the second source_column from the first.
+                - "product": Multiplies the values of the source_columns.
+                - "quotient": Divides the first source_column by the second.
+                - "mean": Calculates the average of the source_columns.
+            source_columns (List[str]): A list of column names to use in the operation.
+                - For "difference" and "quotient", the list must contain exactly two columns.
+                - For other operations, the list can contain two or more columns.
+        """
+        try:
+            updated_df = transformation_tools.add_new_column_from_math_operation(self._get_df(df_type), column_name, operation_type, source_columns)
+            self._set_df(updated_df, df_type)
+            return ToolResponse(
+                execution_success=True,
+                success_message=f"Successfully added new column '{column_name}' with a '{operation_type}' operation."
+            )
+        except Exception as e:
+            return ToolResponse(
+                execution_success=False,
+                error_message=str(e)
+            )
 
-            This is used for data enrichment, such as adding descriptive names from a lookup table.
+    def _merge_dataframes(self, primary_df_col: str, mapping_df_col: str, new_column_name: str) -> ToolResponse:
+        """
+        Merges the mapping DataFrame into the primary DataFrame based on a common key.
 
-            Args:
-                primary_df_col (str): The name of the column in the primary DataFrame to merge on.
-                mapping_df_col (str): The name of the column in the mapping DataFrame to merge on.
-                new_column_name (str): The name for the new column that will be added to the primary DataFrame.
-            """
-            try:
-                mapping_df = self._get_df(DataFrameType.MAPPING)
-                if mapping_df is None or mapping_df.empty:
-                    return ToolResponse(
-                        execution_success=False,
-                        error_message="Mapping DataFrame is not available or is empty. Cannot perform merge operation."
-                    )
+        This is used for data enrichment, such as adding descriptive names from a lookup table.
 
-                updated_df = transformation_tools.merge_dataframes(
-                    primary_df=self._get_df(DataFrameType.PRIMARY),
-                    mapping_df=mapping_df,
-                    primary_df_col=primary_df_col,
-                    mapping_df_col=mapping_df_col,
-                    new_column_name=new_column_name
-                )
-                self._set_df(updated_df, df_type=DataFrameType.PRIMARY)
-                return ToolResponse(
-                    execution_success=True,
-                    success_message=f"Successfully merged data and added new column '{new_column_name}'."
-                )
-            except Exception as e:
+        Args:
+            primary_df_col (str): The name of the column in the primary DataFrame to merge on.
+            mapping_df_col (str): The name of the column in the mapping DataFrame to merge on.
+            new_column_name (str): The name for the new column that will be added to the primary DataFrame.
+        """
+        try:
+            mapping_df = self._get_df("mapping")
+            if mapping_df is None or mapping_df.empty:
                 return ToolResponse(
                     execution_success=False,
-                    error_message=str(e)
+                    error_message="Mapping DataFrame is not available or is empty. Cannot perform merge operation."
                 )
 
-        return [
-            get_column_names,
-            get_column_detailed_information,
-            get_categorical_and_continuous_info,
-            get_column_sample_values,
-            rename_column,
-            replace_value,
-            add_new_column_from_math_operation,
-            merge_dataframes,
-        ]
+            updated_df = transformation_tools.merge_dataframes(
+                primary_df=self._get_df("primary"),
+                mapping_df=mapping_df,
+                primary_df_col=primary_df_col,
+                mapping_df_col=mapping_df_col,
+                new_column_name=new_column_name,
+                mapping_key_index=self._get_merge_key_index(mapping_df, mapping_df_col)
+            )
+            self._set_df(updated_df, df_type="primary")
+            return ToolResponse(
+                execution_success=True,
+                success_message=f"Successfully merged data and added new column '{new_column_name}'."
+            )
+        except Exception as e:
+            return ToolResponse(
+                execution_success=False,
+                error_message=str(e)
+            )
 
     def get_prompt(self) -> ChatPromptTemplate:
         """
@@ -276,26 +592,37 @@ class DataAgent:
 
         Subclasses can extend or modify this prompt to provide specific instructions.
         """
-        system_message = DATA_AGENT_PROMPT
-        return ChatPromptTemplate.from_messages([
-            ("system", system_message),
-            MessagesPlaceholder(variable_name="chat_history"),
-            ("human", "{input}"),
-            MessagesPlaceholder(variable_name="agent_scratchpad"),
-        ])
+        return _DATA_AGENT_PROMPT_TEMPLATE
 
     def create_executor(self) -> AgentExecutor:
         """
         Creates the AgentExecutor instance.
+
+        The tool-calling agent is shared with other instances using the same LLM, prompt and
+        tool schemas; the executor is per instance since it runs this agent's own tools.
         """
-        agent = create_tool_calling_agent(self.llm, self.tools, self.prompt)
-        return AgentExecutor(agent=agent, tools=self.tools, verbose=True)
+        settings = get_settings()
+        agent = _get_agent_runnable(self.llm, self.tools, self.prompt)
+        return ParallelToolAgentExecutor(
+            agent=agent,
+            tools=self.tools,
+            # Printing every step repr()s tool inputs and outputs; only do it when debugging locally.
+            verbose=settings.DEBUG and settings.STAGE == "local",
+            max_iterations=settings.MAX_ITERATIONS,
+            return_intermediate_steps=False,
+            max_concurrency=min(8, os.cpu_count() or 1),
+            read_only_tools=READ_ONLY_TOOLS,
+        )
 
     def run(self, query: str) -> Dict[str, Any]:
         """
         Runs a query through the agent and returns the result.
         """
-        result = self.agent_executor.invoke({"input": query, "chat_history": self.chat_history})
-        self.chat_history.append(HumanMessage(content=query))
-        self.chat_history.append(AIMessage(content=result['output']))
+        result = self.agent_executor.invoke({"input": query, "chat_history": list(self.chat_history)})
+        # Leave the stored DataFrames fully up to date for the caller.
+        for df_type in DATAFRAME_TYPES:
+            self._apply_pending_ops(df_type)
+        # Plain text messages need no validation; model_construct skips it.
+        self.chat_history.append(HumanMessage.model_construct(content=query))
+        self.chat_history.append(AIMessage.model_construct(content=result['output']))
         return result
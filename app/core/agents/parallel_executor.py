@@ -0,0 +1,70 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextvars import ContextVar
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+from langchain_core.callbacks import CallbackManagerForChainRun
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_core.tools import BaseTool
+
+
+# Thread pool and in-flight tool calls of the agent step currently being executed.
+_step_pool: ContextVar[Optional[Tuple[ThreadPoolExecutor, List[Future]]]] = ContextVar("_step_pool", default=None)
+
+
+class ParallelToolAgentExecutor(AgentExecutor):
+    """
+    An AgentExecutor that runs the read-only tool calls of a single step concurrently.
+
+    pandas and NumPy release the GIL inside most of their kernels, so inspection tools over
+    large DataFrames overlap well in threads. Any tool not listed in `read_only_tools` first
+    waits for the calls already running and then runs on its own, so writes never race
+    with reads. Observations are returned in the order the LLM requested the calls.
+    """
+    max_concurrency: int = 1
+    read_only_tools: FrozenSet[str] = frozenset()
+
+    def _iter_next_step(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps: List[Tuple[AgentAction, str]],
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        if self.max_concurrency <= 1 or not self.read_only_tools:
+            yield from super()._iter_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager)
+            return
+
+        with ContextThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            token = _step_pool.set((pool, []))
+            try:
+                outputs = list(super()._iter_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager))
+            finally:
+                _step_pool.reset(token)
+
+        for output in outputs:
+            if isinstance(output, AgentStep) and isinstance(output.observation, Future):
+                output = output.observation.result()
+            yield output
+
+    def _perform_agent_action(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        agent_action: AgentAction,
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> AgentStep:
+        step_pool = _step_pool.get()
+        if step_pool is None:
+            return super()._perform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+
+        pool, running = step_pool
+        if agent_action.tool in self.read_only_tools:
+            # Resolved back into the tool's AgentStep by `_iter_next_step`.
+            future = pool.submit(super()._perform_agent_action, name_to_tool_map, color_mapping, agent_action, run_manager)
+            running.append(future)
+            return AgentStep(action=agent_action, observation=future)
+
+        wait(running)
+        return super()._perform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
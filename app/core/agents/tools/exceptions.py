@@ -18,7 +18,11 @@ class DataProcessingError(DataFrameError):
 class ColumnNotFoundError(DataFrameError):
     """Raised when a specified column is not found in the DataFrame."""
     def __init__(self, column_name: str, available_columns: list):
-        available = ", ".join(available_columns)
-        super().__init__(
-            f"Column '{column_name}' not found. Available columns: {available}"
-        )
+        # The message lists every column, so it is only built when the error is shown.
+        self.column_name = column_name
+        self.available_columns = available_columns
+        super().__init__(column_name)
+
+    def __str__(self) -> str:
+        available = ", ".join(self.available_columns)
+        return f"Column '{self.column_name}' not found. Available columns: {available}"
@@ -1,7 +1,12 @@
+import math
+import numpy as np
 import pandas as pd
 from app.core.agents.tools.types import DataFrameColumnNames, DataFrameColumn, DataFrameColumnList, DataFrameColumnDetailedInformation, CategoricalValue, DataFrameColumnSampleValues, DataFrameColumnSampleValuesList
 from app.core.agents.tools.exceptions import EmptyDataFrameError, DataProcessingError, ColumnNotFoundError
 
+# Minimum number of leading rows inspected before a column can be classified as continuous early.
+CLASSIFICATION_PREFIX_ROWS = 10_000
+
 
 def get_column_names(df: pd.DataFrame) -> DataFrameColumnNames:
     if df.empty:
@@ -9,31 +14,64 @@ def get_column_names(df: pd.DataFrame) -> DataFrameColumnNames:
     return DataFrameColumnNames(column_names=list(df.columns))
 
 
+def _distinct_ratios(df: pd.DataFrame, num_rows: int) -> np.ndarray:
+    """
+    Returns each column's number of distinct values divided by `num_rows`. If the frame-wide
+    count fails, the columns are counted one at a time so the error names the offending column.
+    """
+    try:
+        return (df.nunique() / num_rows).to_numpy()
+    except Exception:
+        pass
+    ratios = np.empty(len(df.columns))
+    for position, col in enumerate(df.columns):
+        try:
+            ratios[position] = df.iloc[:, position].nunique() / num_rows
+        except Exception as e:
+            raise DataProcessingError(operation="column analysis", details=f"Error processing column '{col}': {str(e)}")
+    return ratios
+
+
 def get_categorical_and_continuous_information(df: pd.DataFrame) -> DataFrameColumnList:
-    if df.empty:
+    num_rows = len(df)
+    if num_rows == 0 or df.columns.empty:
         raise EmptyDataFrameError(operation="categorical and continuous info analysis")
         
     columns_info = DataFrameColumnList(columns=[])
-    num_rows = len(df)
 
-    for col in df.columns:
-        try:
-            unique_values = df[col].dropna().unique().tolist()
-            num_unique = len(unique_values)
+    # A prefix of the rows is enough to rule a column continuous once it alone holds
+    # 10% of the row count in distinct values, so the full unique list is never built.
+    prefix_rows = max(CLASSIFICATION_PREFIX_ROWS, math.ceil(num_rows * 0.2))
 
-            # Heuristic: A column is categorical if it has a low number of unique values
-            is_categorical = (num_unique / num_rows < 0.1) if num_rows > 0 else False
-            
-            if is_categorical:
-                columns_info.columns.append(DataFrameColumn(
+    # Heuristic: A column is categorical if it has a low number of unique values.
+    # Distinct values are counted for all columns at once; the unique values themselves
+    # are only listed for the categorical columns.
+    if prefix_rows < num_rows:
+        is_candidate = _distinct_ratios(df.iloc[:prefix_rows], num_rows) < 0.1
+    else:
+        is_candidate = np.ones(len(df.columns), dtype=bool)
+    is_categorical = np.zeros(len(df.columns), dtype=bool)
+    if is_candidate.any():
+        is_categorical[is_candidate] = _distinct_ratios(df.iloc[:, is_candidate], num_rows) < 0.1
+
+    for position, col in enumerate(df.columns):
+        try:
+            if is_categorical[position]:
+                # Missing values are dropped from the few unique values rather than from
+                # the whole column, which would copy it first.
+                unique_values = df.iloc[:, position].unique()
+                unique_values = unique_values[~pd.isna(unique_values)]
+                # The unique value list is freshly built and can be long; skip validating
+                # (and copying) it element by element.
+                columns_info.columns.append(DataFrameColumn.model_construct(
                     column_name=col,
-                    unique_values=unique_values,
-                    is_categorical=is_categorical
+                    unique_values=unique_values.tolist(),
+                    is_categorical=True
                 ))
             else:
                 columns_info.columns.append(DataFrameColumn(
                     column_name=col,
-                    is_categorical=is_categorical
+                    is_categorical=False
                 ))
         except Exception as e:
             raise DataProcessingError(operation="column analysis", details=f"Error processing column '{col}': {str(e)}")
@@ -42,34 +80,43 @@ def get_categorical_and_continuous_information(df: pd.DataFrame) -> DataFrameCol
 
 def get_column_detailed_information(df: pd.DataFrame, column_name: str) -> DataFrameColumnDetailedInformation:
     try:
-        if df.empty:
+        total = len(df)
+        if total == 0 or df.columns.empty:
             raise EmptyDataFrameError(operation="unique values analysis")
             
+        columns = df.columns
         if not column_name:
-            raise ColumnNotFoundError(column_name="", available_columns=list(df.columns))
+            raise ColumnNotFoundError(column_name="", available_columns=list(columns))
             
-        if column_name not in df.columns:
-            raise ColumnNotFoundError(column_name, list(df.columns))
+        if column_name not in columns:
+            raise ColumnNotFoundError(column_name, list(columns))
         
+        # Columns of category dtype already count their integer codes here.
         value_counts = df[column_name].value_counts(dropna=False)
-        total = len(df)
         
-        column_detailed_info = DataFrameColumnDetailedInformation(
+        unique_values = value_counts.index.tolist()
+        # Missing-value flags and percentages are computed for all values at once.
+        is_missing = value_counts.index.isna().tolist()
+        counts = value_counts.to_numpy()
+        percentages = (counts * (100.0 / total)).tolist()
+        value_details = [
+            CategoricalValue(
+                value="<MISSING>" if missing else str(value),
+                count=count,
+                percentage=round(percentage, 1)
+            )
+            for value, count, percentage, missing in zip(unique_values, counts.tolist(), percentages, is_missing)
+        ]
+        
+        # Both lists are freshly built from pandas data and can be long, so the model is
+        # assembled without validating them again element by element.
+        column_detailed_info = DataFrameColumnDetailedInformation.model_construct(
             column_name=column_name,
             is_categorical=True,
-            unique_values=value_counts.index.tolist(),
-            value_details=[]
+            unique_values=unique_values,
+            value_details=value_details
         )
         
-        for value, count in value_counts.items():
-            value_str = str(value) if pd.notna(value) else "<MISSING>"
-            percentage = (count / total) * 100
-            column_detailed_info.value_details.append(CategoricalValue(
-                value=value_str,
-                count=int(count),
-                percentage=round(percentage, 1)
-            ))
-        
         return column_detailed_info
         
     except Exception as e:
@@ -80,14 +127,18 @@ def get_column_detailed_information(df: pd.DataFrame, column_name: str) -> DataF
 
 def get_column_sample_values(df: pd.DataFrame, num_samples: int = 5) -> DataFrameColumnSampleValuesList:
     try:
-        if df.empty:
+        num_rows = len(df)
+        if num_rows == 0 or df.columns.empty:
             raise EmptyDataFrameError(operation="column sample values")
+        # One row sample shared by all columns; with the same seed this picks the same rows
+        # that sampling each column separately would.
+        sample_df = df.sample(n=min(num_samples, num_rows), random_state=42)
         sample_values = DataFrameColumnSampleValuesList(columns=[])
-        for column_name in df.columns:
+        for position, column_name in enumerate(sample_df.columns):
             sample_values.columns.append(
                 DataFrameColumnSampleValues(
                     column_name=column_name,
-                    sample_values=df[column_name].sample(num_samples, random_state=42).tolist()
+                    sample_values=sample_df.iloc[:, position].tolist()
                 )
             )
         return sample_values
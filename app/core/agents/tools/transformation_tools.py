@@ -1,27 +1,52 @@
+import functools
+import operator
+import warnings
+import numpy as np
 import pandas as pd
-from typing import List
+from typing import Callable, Dict, List, Optional, Sequence
 from app.core.agents.tools.exceptions import EmptyDataFrameError, DataProcessingError, ColumnNotFoundError
 
 
+def validate_rename_column(columns: Sequence[str], old_column_name: str, new_column_name: str) -> None:
+    if not old_column_name:
+        raise ColumnNotFoundError(old_column_name, list(columns))
+    if not new_column_name:
+        raise ColumnNotFoundError(new_column_name, list(columns))
+    if old_column_name not in columns:
+        raise ColumnNotFoundError(old_column_name, list(columns))
+
+    if new_column_name in columns and new_column_name != old_column_name:
+        raise DataProcessingError(
+            operation="column rename",
+            details="new column name already exists"
+        )
+
+
+def _relabel_columns(df: pd.DataFrame, mapping: Dict[str, str]) -> None:
+    """
+    Renames columns in place by writing the new labels at the old labels' positions,
+    instead of passing every label through the mapping as `DataFrame.rename` does.
+    """
+    columns = df.columns
+    if isinstance(columns, pd.MultiIndex) or columns.dtype != object or not columns.is_unique:
+        df.rename(columns=mapping, inplace=True)
+        return
+
+    labels = columns.to_numpy(copy=True)
+    for position, new_column_name in zip(columns.get_indexer(list(mapping)), mapping.values()):
+        if position != -1:
+            labels[position] = new_column_name
+    df.columns = pd.Index(labels, dtype=object, name=columns.name)
+
+
 def rename_column(df: pd.DataFrame, old_column_name: str, new_column_name: str) -> pd.DataFrame:
     try:
         if df.empty:
             raise EmptyDataFrameError(operation="column rename")
-            
-        if not old_column_name:
-            raise ColumnNotFoundError(old_column_name, list(df.columns))
-        if not new_column_name:
-            raise ColumnNotFoundError(new_column_name, list(df.columns))
-        if old_column_name not in df.columns:
-            raise ColumnNotFoundError(old_column_name, list(df.columns))
-            
-        if new_column_name in df.columns and new_column_name != old_column_name:
-            raise DataProcessingError(
-                operation="column rename",
-                details="new column name already exists"
-            )
-            
-        df.rename(columns={old_column_name: new_column_name}, inplace=True)
+
+        validate_rename_column(df.columns, old_column_name, new_column_name)
+
+        _relabel_columns(df, {old_column_name: new_column_name})
         return df
     except Exception as e:
         if not isinstance(e, (EmptyDataFrameError, DataProcessingError, ColumnNotFoundError)):
@@ -32,23 +57,66 @@ def rename_column(df: pd.DataFrame, old_column_name: str, new_column_name: str)
         raise
 
 
+def rename_columns(df: pd.DataFrame, mapping: Dict[str, str]) -> pd.DataFrame:
+    """
+    Applies several column renames in a single pass. The mapping is applied
+    simultaneously, so chained renames must already be composed by the caller.
+    """
+    try:
+        _relabel_columns(df, mapping)
+        return df
+    except Exception as e:
+        raise DataProcessingError(
+            operation="column rename",
+            details=f"unexpected error: {str(e)}"
+        )
+
+
+def validate_replace_value(columns: Sequence[str], column_name: str, old_value: str, new_value: str) -> None:
+    if not column_name or not old_value or not new_value:
+        raise DataProcessingError(operation="replace value", details="Missing required parameters. Please provide 'column_name', 'old_value', and 'new_value'.")
+
+    if column_name not in columns:
+        raise ColumnNotFoundError(column_name, list(columns))
+
+
+def is_missing_value_marker(value: str) -> bool:
+    return str(value).lower() in ['nan', 'none']
+
+
 def replace_value(df: pd.DataFrame, column_name: str, old_value: str, new_value: str) -> pd.DataFrame:
     try:
-        if not column_name or not old_value or not new_value:
-            raise DataProcessingError(operation="replace value", details="Missing required parameters. Please provide 'column_name', 'old_value', and 'new_value'.")
-        
-        if column_name not in df.columns:
-            raise ColumnNotFoundError(column_name, list(df.columns))
-        
-        if str(old_value).lower() in ['nan', 'none']:
-            mask = df[column_name].isna()
-            df.loc[mask, column_name] = new_value
+        validate_replace_value(df.columns, column_name, old_value, new_value)
+
+        column = df[column_name]
+        if is_missing_value_marker(old_value):
+            mask = column.isna().to_numpy()
+            positions = np.flatnonzero(mask)
+            if positions.size == 0:
+                return df
+            fill_value = new_value
+            if isinstance(column.dtype, np.dtype) and column.dtype.kind in "iuf":
+                # Keep numeric columns numeric when the replacement parses as a number.
+                try:
+                    fill_value = column.dtype.type(new_value)
+                except (ValueError, TypeError):
+                    pass
+            values = column.to_numpy(copy=False)
+            if (
+                isinstance(column.dtype, np.dtype)
+                and (column.dtype == object or isinstance(fill_value, column.dtype.type))
+                and values.flags.writeable
+                and not getattr(pd.options.mode, "copy_on_write", True)
+            ):
+                # Writes only the missing positions straight into the column's storage.
+                values[positions] = fill_value
+            else:
+                df.loc[mask, column_name] = fill_value
             return df
-        
-        mask = df[column_name] == old_value
-        if not mask.any():
+
+        if old_value == new_value:
             return df
-        df[column_name] = df[column_name].replace(old_value, new_value)
+        _replace_in_column(df, column_name, {old_value: new_value})
         return df
     except Exception as e:
         if not isinstance(e, (EmptyDataFrameError, DataProcessingError, ColumnNotFoundError)):
@@ -56,6 +124,133 @@ def replace_value(df: pd.DataFrame, column_name: str, old_value: str, new_value:
         raise
 
 
+def replace_values(df: pd.DataFrame, column_name: str, mapping: Dict[str, str]) -> pd.DataFrame:
+    """
+    Applies several value replacements to one column in a single pass. The mapping is
+    applied simultaneously, so chained replacements must already be composed by the caller.
+    """
+    try:
+        _replace_in_column(df, column_name, mapping)
+        return df
+    except Exception as e:
+        raise DataProcessingError(operation="replace value", details=str(e))
+
+
+def _replace_in_column(df: pd.DataFrame, column_name: str, mapping: Dict[str, str]) -> None:
+    """
+    Replaces values of one column in place, shared by `replace_value` and `replace_values`
+    so that eager and batched replacements give the same values and dtypes.
+    """
+    column = df[column_name]
+    if not isinstance(column.dtype, np.dtype):
+        # Extension dtypes (category, string, ...) keep pandas' own replace.
+        matched = {old_value: new_value for old_value, new_value in mapping.items() if (column == old_value).any()}
+        if matched:
+            df[column_name] = column.replace(matched)
+        return
+
+    # Each comparison finds the matches and the same mask selects the replacements. Masks
+    # are taken on the original values, so the mapping is applied simultaneously. Unlike
+    # Series.replace, np.where never downcasts the column to a numeric dtype.
+    values = column.to_numpy(copy=False)
+    replaced = values
+    for old_value, new_value in mapping.items():
+        mask = values == old_value
+        if mask.any():
+            replaced = np.where(mask, new_value, replaced)
+    if replaced is not values:
+        df[column_name] = replaced
+
+
+# Row-wise operations over numeric source columns; nansum/nanmean skip missing values
+# like pandas does, while product, difference and quotient propagate them. Reductions run
+# in one NumPy call over a single 2D block of the source columns; the two-column operations
+# work directly on the two column arrays, so no 2D block is gathered for them.
+_MATH_OPERATIONS: Dict[str, Callable[[pd.DataFrame, List[str]], np.ndarray]] = {
+    "sum": lambda df, columns: np.nansum(df[columns].to_numpy(), axis=1),
+    "difference": lambda df, columns: np.subtract(df[columns[0]].to_numpy(), df[columns[1]].to_numpy()),
+    "product": lambda df, columns: np.prod(df[columns].to_numpy(), axis=1),
+    "quotient": lambda df, columns: np.divide(df[columns[0]].to_numpy(), df[columns[1]].to_numpy()),
+    "mean": lambda df, columns: np.nanmean(df[columns].to_numpy(), axis=1),
+}
+
+# Fallback for source columns without a plain numeric dtype.
+_PANDAS_MATH_OPERATIONS: Dict[str, Callable[[pd.DataFrame], pd.Series]] = {
+    "sum": lambda source: source.sum(axis=1),
+    "difference": lambda source: source.iloc[:, 0] - source.iloc[:, 1],
+    "product": lambda source: functools.reduce(operator.mul, (source.iloc[:, i] for i in range(1, source.shape[1])), source.iloc[:, 0]),
+    "quotient": lambda source: source.iloc[:, 0] / source.iloc[:, 1],
+    "mean": lambda source: source.mean(axis=1),
+}
+
+_TWO_COLUMN_OPERATIONS = frozenset({"difference", "quotient"})
+
+# With numba installed, sums and products over at least this many float64 columns run as
+# one fused pass over the column arrays instead of first gathering them into a 2D block.
+FUSED_MIN_SOURCE_COLUMNS = 8
+
+
+@functools.lru_cache(maxsize=1)
+def _fused_math_operations() -> Dict[str, Callable]:
+    """
+    Compiles the numba kernels on first use; numba is optional and slow to import, so it is
+    only imported once a wide enough sum or product needs it. Empty without numba.
+    """
+    try:
+        import numba
+    except ImportError:
+        return {}
+
+    # Not `parallel=True`: tools run in concurrent agent threads, which numba's default
+    # workqueue threading layer aborts the process on. The tool threads parallelize instead.
+    @numba.njit(cache=True)
+    def fused_nansum(columns):
+        out = np.empty(columns[0].shape[0])
+        for i in range(out.shape[0]):
+            total = 0.0
+            for column in columns:
+                value = column[i]
+                # `value == value` is False only for NaN; written as a select, the loop
+                # stays branch-free and vectorizes.
+                total += value if value == value else 0.0
+            out[i] = total
+        return out
+
+    @numba.njit(cache=True)
+    def fused_prod(columns):
+        out = np.empty(columns[0].shape[0])
+        for i in range(out.shape[0]):
+            product = 1.0
+            for column in columns:
+                product *= column[i]
+            out[i] = product
+        return out
+
+    return {"sum": fused_nansum, "product": fused_prod}
+
+
+def _fused_math_operation(df: pd.DataFrame, operation_type: str, source_columns: List[str]) -> Optional[np.ndarray]:
+    """
+    Runs a sum or product through the numba kernels when they apply, otherwise returns None.
+    """
+    if operation_type not in ("sum", "product") or len(source_columns) < FUSED_MIN_SOURCE_COLUMNS:
+        return None
+    if any(df[col].dtype != np.float64 for col in source_columns):
+        return None
+    kernel = _fused_math_operations().get(operation_type)
+    if kernel is None:
+        return None
+    from numba import types
+    from numba.typed import List as NumbaList
+
+    # Column views out of a pandas block are strided; typing the list for strided arrays
+    # lets them share one list with contiguous columns without copying either.
+    columns = NumbaList.empty_list(types.Array(types.float64, 1, "A"))
+    for col in source_columns:
+        columns.append(df[col].to_numpy())
+    return kernel(columns)
+
+
 def add_new_column_from_math_operation(df: pd.DataFrame, column_name: str, operation_type: str, source_columns: List[str]) -> pd.DataFrame:
     if not isinstance(column_name, str) or not column_name:
         raise DataProcessingError(operation="add new column from math operation", details="`column_name` must be a non-empty string.")
@@ -67,24 +262,24 @@ def add_new_column_from_math_operation(df: pd.DataFrame, column_name: str, opera
             raise ColumnNotFoundError(col, list(df.columns))
 
     try:
-        if operation_type == "sum":
-            df[column_name] = df[source_columns].sum(axis=1)
-        elif operation_type == "difference":
-            if len(source_columns) != 2:
-                raise DataProcessingError(operation="add new column from math operation", details="'difference' operation requires exactly two source columns.")
-            df[column_name] = df[source_columns[0]] - df[source_columns[1]]
-        elif operation_type == "product":
-            df[column_name] = df[source_columns[0]]
-            for col in source_columns[1:]:
-                df[column_name] *= df[col]
-        elif operation_type == "quotient":
-            if len(source_columns) != 2:
-                raise DataProcessingError(operation="add new column from math operation", details="'quotient' operation requires exactly two source columns.")
-            df[column_name] = df[source_columns[0]] / df[source_columns[1]]
-        elif operation_type == "mean":
-            df[column_name] = df[source_columns].mean(axis=1)
-        else:
+        if operation_type not in _MATH_OPERATIONS:
             raise DataProcessingError(operation="add new column from math operation", details=f"Unsupported operation_type '{operation_type}'. Please use 'sum', 'difference', 'product', 'quotient', or 'mean'.")
+        if operation_type in _TWO_COLUMN_OPERATIONS and len(source_columns) != 2:
+            raise DataProcessingError(operation="add new column from math operation", details=f"'{operation_type}' operation requires exactly two source columns.")
+
+        # Plain numeric columns go through NumPy; anything else (strings, nullable/extension
+        # dtypes) keeps the pandas path.
+        is_numeric = all(isinstance(df[col].dtype, np.dtype) and df[col].dtype.kind in "iuf" for col in source_columns)
+        with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+            # All-NaN rows yield NaN, as in pandas, without a "Mean of empty slice" warning.
+            warnings.simplefilter("ignore", RuntimeWarning)
+            if is_numeric:
+                result = _fused_math_operation(df, operation_type, source_columns)
+                if result is None:
+                    result = _MATH_OPERATIONS[operation_type](df, source_columns)
+                df[column_name] = result
+            else:
+                df[column_name] = _PANDAS_MATH_OPERATIONS[operation_type](df[source_columns])
     except Exception as e:
         if not isinstance(e, (EmptyDataFrameError, DataProcessingError, ColumnNotFoundError)):
             raise DataProcessingError(operation="add new column from math operation", details=f"An unexpected error occurred during the operation: {e}")
@@ -92,27 +287,63 @@ def add_new_column_from_math_operation(df: pd.DataFrame, column_name: str, opera
     return df
 
 
+def build_merge_key_index(mapping_df: pd.DataFrame, mapping_df_col: str) -> pd.Index:
+    """
+    Builds the hashed lookup index over a mapping key column used by `merge_dataframes`.
+    pandas caches the hash table on the Index, so reusing it while the mapping DataFrame
+    is unchanged avoids re-hashing the mapping keys on every merge.
+    """
+    return pd.Index(mapping_df[mapping_df_col])
+
+
+def _can_merge_by_lookup(primary_df: pd.DataFrame, mapping_df: pd.DataFrame, primary_df_col: str, mapping_key_index: pd.Index) -> bool:
+    # A left merge on a unique, null-free key with an identical plain dtype and no
+    # overlapping column names is exactly a positional gather of the mapping rows.
+    primary_key = primary_df[primary_df_col]
+    return (
+        isinstance(primary_key.dtype, np.dtype)
+        and primary_key.dtype == mapping_key_index.dtype
+        and mapping_key_index.is_unique
+        and not mapping_key_index.hasnans
+        and primary_df.columns.intersection(mapping_df.columns).empty
+        and not primary_key.isna().any()
+    )
+
+
+def _merge_by_lookup(primary_df: pd.DataFrame, mapping_df: pd.DataFrame, primary_df_col: str, mapping_key_index: pd.Index) -> pd.DataFrame:
+    indexer = mapping_key_index.get_indexer(primary_df[primary_df_col])
+    # Unmatched rows (-1) are not in the RangeIndex, so reindex fills them with NaN.
+    matched = mapping_df.reset_index(drop=True).reindex(indexer).reset_index(drop=True)
+    return pd.concat([primary_df.reset_index(drop=True), matched], axis=1)
+
+
 def merge_dataframes(
     primary_df: pd.DataFrame,
     mapping_df: pd.DataFrame,
     primary_df_col: str,
     mapping_df_col: str,
-    new_column_name: str
+    new_column_name: str,
+    mapping_key_index: Optional[pd.Index] = None
 ) -> pd.DataFrame:
-    if primary_df_col not in primary_df.columns:
-        raise ColumnNotFoundError(primary_df_col, list(primary_df.columns))
+    primary_columns = primary_df.columns
+    if primary_df_col not in primary_columns:
+        raise ColumnNotFoundError(primary_df_col, list(primary_columns))
     
-    if mapping_df_col not in mapping_df.columns:
-        raise ColumnNotFoundError(mapping_df_col, list(mapping_df.columns))
+    mapping_columns = mapping_df.columns
+    if mapping_df_col not in mapping_columns:
+        raise ColumnNotFoundError(mapping_df_col, list(mapping_columns))
     
     try:
-        merged_df = pd.merge(
-            primary_df,
-            mapping_df,
-            left_on=primary_df_col,
-            right_on=mapping_df_col,
-            how='left'
-        )
+        if mapping_key_index is not None and _can_merge_by_lookup(primary_df, mapping_df, primary_df_col, mapping_key_index):
+            merged_df = _merge_by_lookup(primary_df, mapping_df, primary_df_col, mapping_key_index)
+        else:
+            merged_df = pd.merge(
+                primary_df,
+                mapping_df,
+                left_on=primary_df_col,
+                right_on=mapping_df_col,
+                how='left'
+            )
         merged_df.rename(columns={merged_df.columns[-1]: new_column_name}, inplace=True)
         return merged_df
     except Exception as e:
@@ -1,4 +1,5 @@
-from typing import Dict, Optional
+import threading
+from typing import Any, Dict, Optional, Tuple
 from langchain_litellm.chat_models import ChatLiteLLM
 
 
@@ -9,7 +10,8 @@ class LLMFactory:
     This class maintains a registry of LLM model instances to avoid creating
     duplicate instances of the same model configuration.
     """
-    _instances: Dict[str, ChatLiteLLM] = {}
+    _instances: Dict[Tuple[Any, ...], ChatLiteLLM] = {}
+    _lock = threading.Lock()
     
     @classmethod
     def get_llm(
@@ -33,23 +35,32 @@ class LLMFactory:
         Returns:
             An instance of ChatLiteLLM with the specified configuration
         """
-        config_key = f"{model}_temp{temperature}_maxtok{max_tokens}"
-        
-        if config_key in cls._instances:
-            return cls._instances[config_key]
-            
-        llm = ChatLiteLLM(
-            model=model,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            api_key=api_key,
-            **kwargs
-        )
-        
-        cls._instances[config_key] = llm
+        try:
+            config_key = (model, api_key, temperature, max_tokens, frozenset(kwargs.items()))
+        except TypeError:
+            # Unhashable extra arguments (e.g. a dict of model kwargs) are not cached.
+            return ChatLiteLLM(model=model, temperature=temperature, max_tokens=max_tokens, api_key=api_key, **kwargs)
+
+        llm = cls._instances.get(config_key)
+        if llm is not None:
+            return llm
+
+        with cls._lock:
+            # Another thread may have created the instance while this one waited.
+            llm = cls._instances.get(config_key)
+            if llm is None:
+                llm = ChatLiteLLM(
+                    model=model,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    api_key=api_key,
+                    **kwargs
+                )
+                cls._instances[config_key] = llm
         return llm
     
     @classmethod
     def clear_instances(cls) -> None:
         """Clear all stored LLM instances."""
-        cls._instances.clear()
+        with cls._lock:
+            cls._instances.clear()
@@ -1,8 +1,14 @@
+from __future__ import annotations
+
 import sys
 from pathlib import Path
-from typing import Any, Optional, TypeVar, cast
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
+
+from loguru import logger as _loguru_logger
 
-from loguru import Logger as LoguruLogger
+if TYPE_CHECKING:
+    # loguru only exposes its Logger type to type checkers.
+    from loguru import Logger as LoguruLogger
 
 # Define a type variable for the logger instance
 LoggerType = TypeVar('LoggerType', bound='Logger')
@@ -30,12 +36,14 @@ class Logger:
             log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
             log_file: Optional path to log file. If None, logs only to console.
         """
-        if self._initialized:
+        # `Logger(...)` returns the singleton and re-enters __init__ on every call; the
+        # class-level flag makes those calls return before touching the instance.
+        if Logger._initialized:
             return
 
-        self._logger = cast(LoguruLogger, logger)
+        self._logger: LoguruLogger = _loguru_logger
         self._logger.remove()  # Remove default handler
-        self._initialized = True
+        Logger._initialized = True
 
         # Validate log level
         valid_levels = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
@@ -0,0 +1,43 @@
+from typing import Any, Callable, List, Optional
+
+import pandas as pd
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from app.core.agents.data_agent import DataAgent
+
+
+class FakeToolCallingLLM(GenericFakeChatModel):
+    """A fake chat model that replays scripted messages and accepts bound tools."""
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeToolCallingLLM":
+        return self
+
+
+@pytest.fixture
+def make_llm() -> Callable[..., FakeToolCallingLLM]:
+    def _make_llm(messages: Optional[List[AIMessage]] = None) -> FakeToolCallingLLM:
+        return FakeToolCallingLLM(messages=iter(messages or []), disable_streaming=True)
+
+    return _make_llm
+
+
+@pytest.fixture
+def make_agent(make_llm) -> Callable[..., DataAgent]:
+    def _make_agent(
+        df: pd.DataFrame,
+        mapping_df: Optional[pd.DataFrame] = None,
+        messages: Optional[List[AIMessage]] = None,
+    ) -> DataAgent:
+        return DataAgent(df, make_llm(messages), mapping_df)
+
+    return _make_agent
+
+
+@pytest.fixture
+def tool_of() -> Callable[[DataAgent, str], Any]:
+    def _tool_of(agent: DataAgent, name: str) -> Any:
+        return next(tool for tool in agent.tools if tool.name == name)
+
+    return _tool_of
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from app.core.agents.tools import transformation_tools
+from app.core.agents.tools.exceptions import DataProcessingError
+
+
+def test_parallel_readers_wait_for_pending_operations(make_agent, tool_of, monkeypatch):
+    agent = make_agent(pd.DataFrame({"a": ["x", "y", "x"], "b": [1.0, 2.0, 3.0]}))
+    assert tool_of(agent, "rename_column").invoke({"old_column_name": "a", "new_column_name": "city"}).execution_success
+
+    rename_columns = transformation_tools.rename_columns
+
+    def slow_rename_columns(df, mapping):
+        # Widens the window in which another reader could see a half-applied frame.
+        time.sleep(0.2)
+        return rename_columns(df, mapping)
+
+    monkeypatch.setattr(transformation_tools, "rename_columns", slow_rename_columns)
+
+    barrier = threading.Barrier(4)
+    results = []
+
+    def read(tool_name):
+        barrier.wait()
+        results.append(tool_of(agent, tool_name).invoke({}))
+
+    threads = [
+        threading.Thread(target=read, args=(name,))
+        for name in ("get_categorical_and_continuous_info", "get_column_sample_values") * 2
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(result.execution_success for result in results)
+    for result in results:
+        assert [column.column_name for column in result.other_info.columns] == ["city", "b"]
+    classification = tool_of(agent, "get_categorical_and_continuous_info").invoke({})
+    assert [column.column_name for column in classification.other_info.columns] == ["city", "b"]
+    assert list(agent._get_df("primary").columns) == ["city", "b"]
+
+
+def test_replace_after_rename_finds_value_in_cached_unique_values(make_agent, tool_of):
+    agent = make_agent(pd.DataFrame({"a": ["x", "y", "x"], "b": [1.0, 2.0, 3.0]}))
+    # Caches the unique values of "a".
+    assert tool_of(agent, "get_column_detailed_information").invoke({"column_name": "a"}).execution_success
+    assert tool_of(agent, "rename_column").invoke({"old_column_name": "a", "new_column_name": "city"}).execution_success
+
+    result = tool_of(agent, "replace_value").invoke({"column_name": "city", "old_value": "x", "new_value": "z"})
+    assert result.execution_success
+    assert result.success_message.startswith("Successfully replaced")
+    no_op = tool_of(agent, "replace_value").invoke({"column_name": "city", "old_value": "x", "new_value": "w"})
+    assert no_op.execution_success and no_op.success_message.startswith("No change")
+
+    assert agent._get_df("primary")["city"].tolist() == ["z", "y", "z"]
+
+
+def test_dfs_returns_frames_with_pending_operations_applied(make_agent, tool_of):
+    mapping_df = pd.DataFrame({"key": [1]})
+    agent = make_agent(pd.DataFrame({"a": [1, 2]}), mapping_df=mapping_df)
+    assert tool_of(agent, "rename_column").invoke({"old_column_name": "a", "new_column_name": "b"}).execution_success
+
+    assert list(agent.dfs["primary"].columns) == ["b"]
+    assert agent.dfs["mapping"] is mapping_df
+
+
+def test_failed_pending_operation_does_not_reapply_earlier_ones(make_agent, tool_of, monkeypatch):
+    agent = make_agent(pd.DataFrame({"a": ["x", "y"], "b": [1.0, 2.0]}))
+    # Swaps "x" and "y": applying the fused mapping twice would swap them back.
+    for old_value, new_value in (("x", "t"), ("y", "x"), ("t", "y")):
+        assert tool_of(agent, "replace_value").invoke({"column_name": "a", "old_value": old_value, "new_value": new_value}).execution_success
+    assert tool_of(agent, "rename_column").invoke({"old_column_name": "a", "new_column_name": "city"}).execution_success
+    assert tool_of(agent, "replace_value").invoke({"column_name": "city", "old_value": "x", "new_value": "z"}).execution_success
+    assert [op[0] for op in agent._pending_ops["primary"]] == ["replace", "rename", "replace"]
+
+    replace_values = transformation_tools.replace_values
+    calls = []
+
+    def failing_second_replace(df, column_name, mapping):
+        calls.append(column_name)
+        if column_name == "city":
+            raise DataProcessingError(operation="replace value", details="boom")
+        return replace_values(df, column_name, mapping)
+
+    monkeypatch.setattr(transformation_tools, "replace_values", failing_second_replace)
+    with pytest.raises(DataProcessingError):
+        agent._get_df("primary")
+
+    # The swap and the rename were applied exactly once; nothing is left to retry.
+    df = agent._get_df("primary")
+    assert calls == ["a", "city"]
+    assert list(df.columns) == ["city", "b"]
+    assert df["city"].tolist() == ["y", "x"]
+    assert tool_of(agent, "get_column_names").invoke({}).other_info.column_names == ["city", "b"]
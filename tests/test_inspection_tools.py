@@ -0,0 +1,11 @@
+import pandas as pd
+import pytest
+
+from app.core.agents.tools import inspection_tools
+from app.core.agents.tools.exceptions import DataProcessingError
+
+
+def test_classification_error_names_the_offending_column():
+    df = pd.DataFrame({"ok": [1, 2, 3], "tags": [["a"], ["b"], ["a"]]})
+    with pytest.raises(DataProcessingError, match="Error processing column 'tags'"):
+        inspection_tools.get_categorical_and_continuous_information(df)
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from langchain.agents import create_tool_calling_agent
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import StructuredTool
+
+from app.core.agents.parallel_executor import ParallelToolAgentExecutor
+
+
+def test_read_only_tools_overlap_and_writes_wait_for_them(make_llm):
+    events = []
+    lock = threading.Lock()
+
+    def record(name):
+        with lock:
+            events.append(name)
+
+    def read(key: str) -> str:
+        """Reads a value."""
+        record(f"start {key}")
+        time.sleep(0.2)
+        record(f"end {key}")
+        return key
+
+    def write(key: str) -> str:
+        """Writes a value."""
+        record(f"write {key}")
+        return key
+
+    tools = [
+        StructuredTool.from_function(read, name="read"),
+        StructuredTool.from_function(write, name="write"),
+    ]
+    tool_calls = [
+        {"name": "read", "args": {"key": "a"}, "id": "1"},
+        {"name": "read", "args": {"key": "b"}, "id": "2"},
+        {"name": "write", "args": {"key": "c"}, "id": "3"},
+        {"name": "read", "args": {"key": "d"}, "id": "4"},
+    ]
+    llm = make_llm([AIMessage(content="", tool_calls=tool_calls), AIMessage(content="done")])
+    prompt = ChatPromptTemplate.from_messages([
+        ("human", "{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad"),
+    ])
+    executor = ParallelToolAgentExecutor(
+        agent=create_tool_calling_agent(llm, tools, prompt),
+        tools=tools,
+        return_intermediate_steps=True,
+        max_concurrency=4,
+        read_only_tools=frozenset({"read"}),
+    )
+
+    result = executor.invoke({"input": "go"})
+
+    assert result["output"] == "done"
+    # Observations keep the order in which the LLM requested the calls.
+    assert [observation for _, observation in result["intermediate_steps"]] == ["a", "b", "c", "d"]
+    # Both reads start before either finishes, and the write only starts after both.
+    assert set(events[:2]) == {"start a", "start b"}
+    assert set(events[2:4]) == {"end a", "end b"}
+    assert events[4:] == ["write c", "start d", "end d"]
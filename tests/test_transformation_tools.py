@@ -0,0 +1,129 @@
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.agents.tools import transformation_tools
+
+
+@pytest.mark.parametrize(
+    "values, mapping, expected",
+    [
+        ([np.nan, np.nan], {"x": "y"}, [np.nan, np.nan]),
+        (["a", 1, 2], {"a": "3"}, ["3", 1, 2]),
+        (["a", "b", None], {"a": "b", "b": "a"}, ["b", "a", None]),
+    ],
+)
+def test_replace_values_keeps_object_columns(values, mapping, expected):
+    df = pd.DataFrame({"col": pd.Series(values, dtype=object)})
+    with warnings.catch_warnings():
+        # pandas warns when Series.replace silently downcasts the result.
+        warnings.simplefilter("error", FutureWarning)
+        transformation_tools.replace_values(df, "col", mapping)
+    pd.testing.assert_series_equal(df["col"], pd.Series(expected, dtype=object, name="col"))
+
+
+def test_deferred_replacement_matches_eager_replacement(make_agent, tool_of):
+    df = pd.DataFrame({
+        "empty": pd.Series([np.nan] * 3, dtype=object),
+        "mixed": pd.Series(["a", 1, 2], dtype=object),
+    })
+    eager = df.copy()
+    agent = make_agent(df.copy())
+    for column_name, old_value, new_value in [("empty", "x", "y"), ("mixed", "a", "3"), ("mixed", "3", "4")]:
+        assert tool_of(agent, "replace_value").invoke(
+            {"column_name": column_name, "old_value": old_value, "new_value": new_value}
+        ).execution_success
+        transformation_tools.replace_value(eager, column_name, old_value, new_value)
+    pd.testing.assert_frame_equal(agent._get_df("primary"), eager)
+
+
+@pytest.mark.parametrize("operation_type", ["sum", "product"])
+@pytest.mark.parametrize(
+    "num_columns",
+    [transformation_tools.FUSED_MIN_SOURCE_COLUMNS - 1, transformation_tools.FUSED_MIN_SOURCE_COLUMNS, 12],
+)
+def test_fused_math_operations_match_numpy(operation_type, num_columns):
+    pytest.importorskip("numba")
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0.5, 1.5, size=(64, num_columns))
+    values[1, 0] = np.nan
+    values[2, :] = np.nan
+    values[3, 1] = np.inf
+    values[4, 1], values[4, 2] = np.inf, -np.inf
+    values[5, 0], values[5, 1] = np.nan, np.inf
+    values[6, 0] = 0.0
+    values[6, 1] = np.inf
+    df = pd.DataFrame(values, columns=[f"c{i}" for i in range(num_columns)])
+    source_columns = list(df.columns)
+
+    fused = transformation_tools._fused_math_operation(df, operation_type, source_columns)
+    assert (fused is None) == (num_columns < transformation_tools.FUSED_MIN_SOURCE_COLUMNS)
+
+    with np.errstate(invalid="ignore"):
+        expected = transformation_tools._MATH_OPERATIONS[operation_type](df, source_columns)
+    result = transformation_tools.add_new_column_from_math_operation(df, "result", operation_type, source_columns)
+    np.testing.assert_allclose(result["result"].to_numpy(), expected, rtol=1e-12)
+    if fused is not None:
+        np.testing.assert_allclose(fused, expected, rtol=1e-12)
+
+
+def test_fused_math_operations_run_from_concurrent_threads():
+    pytest.importorskip("numba")
+    num_columns = transformation_tools.FUSED_MIN_SOURCE_COLUMNS + 2
+    df = pd.DataFrame(np.random.default_rng(0).uniform(size=(10_000, num_columns)), columns=[f"c{i}" for i in range(num_columns)])
+    source_columns = list(df.columns)
+    expected = np.nansum(df.to_numpy(), axis=1)
+    results = []
+
+    def run():
+        for _ in range(10):
+            results.append(transformation_tools.add_new_column_from_math_operation(df.copy(), "total", "sum", source_columns)["total"].to_numpy())
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 40
+    for result in results:
+        np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "primary_keys, mapping_keys, mapping_extra, expect_fast_path",
+    [
+        ([1, 2, 3, 9], [3, 1, 2], {"code": ["c", "a", "b"]}, True),
+        (["x", "y", "z"], ["y", "x"], {"code": [20, 10]}, True),
+        # Duplicate mapping keys multiply rows.
+        ([1, 2, 3], [1, 1, 2], {"code": ["a", "a2", "b"]}, False),
+        # Missing keys on either side.
+        ([1.0, np.nan, 3.0], [1.0, 3.0], {"code": ["a", "c"]}, False),
+        ([1.0, 2.0], [1.0, np.nan], {"code": ["a", "n"]}, False),
+        # Key columns of different dtypes.
+        ([1, 2, 3], [1.0, 2.0, 3.0], {"code": ["a", "b", "c"]}, False),
+        # Column names shared by both frames get suffixes.
+        ([1, 2], [2, 1], {"value": [20.0, 10.0]}, False),
+    ],
+)
+def test_merge_fast_path_matches_pd_merge(primary_keys, mapping_keys, mapping_extra, expect_fast_path):
+    primary_df = pd.DataFrame({"key": primary_keys, "value": np.arange(len(primary_keys), dtype=float)})
+    mapping_df = pd.DataFrame({"map_key": mapping_keys, **mapping_extra})
+    mapping_key_index = transformation_tools.build_merge_key_index(mapping_df, "map_key")
+
+    assert transformation_tools._can_merge_by_lookup(primary_df, mapping_df, "key", mapping_key_index) is expect_fast_path
+
+    expected = transformation_tools.merge_dataframes(primary_df, mapping_df, "key", "map_key", "mapped")
+    result = transformation_tools.merge_dataframes(primary_df, mapping_df, "key", "map_key", "mapped", mapping_key_index=mapping_key_index)
+    pd.testing.assert_frame_equal(result, expected)
+    if not expect_fast_path:
+        return
+    # The gather itself, not only the fallback, agrees with pd.merge.
+    gathered = transformation_tools._merge_by_lookup(primary_df, mapping_df, "key", mapping_key_index)
+    pd.testing.assert_frame_equal(
+        gathered,
+        pd.merge(primary_df, mapping_df, left_on="key", right_on="map_key", how="left"),
+    )